@@ -1,40 +1,55 @@
-from typing import List
-
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+from cleaning import WEEKDAY_ORDER
+
 
 CLASS_COLOR_MAP = {
     "Earnings": "#4C78A8",
     "Expenses": "#F58518",
 }
 
-WEEKDAY_ORDER: List[str] = [
-    "Monday",
-    "Tuesday",
-    "Wednesday",
-    "Thursday",
-    "Friday",
-    "Saturday",
-    "Sunday",
-]
+NET_WORTH_MAX_POINTS = 2000
+
+WEBGL_MIN_POINTS = 1000
 
 
 def _value_for_class(df: pd.DataFrame, class_label: str) -> pd.Series:
-    values = df["amount"].astype(float)
     if class_label == "Expenses":
-        return -values
-    return values
+        return -df["amount"]
+    return df["amount"]
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    bucket_size = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for bucket in range(n_out - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(areas))
+        selected[bucket + 1] = anchor
+    return selected
 
 
 def monthly_amount_bar(df: pd.DataFrame, class_label: str, title: str) -> px.bar:
     if df.empty:
         return px.bar(title=title)
-    data = df.copy()
-    data["value"] = _value_for_class(data, class_label)
-    monthly = (
-        data.groupby("month", as_index=False)["value"].sum().sort_values("month")
-    )
+    values = _value_for_class(df, class_label)
+    monthly = values.groupby(df["month"], sort=False).sum().sort_index().reset_index(name="value")
     color = CLASS_COLOR_MAP.get(class_label, "#4C78A8")
     fig = px.bar(
         monthly,
@@ -51,11 +66,8 @@ def monthly_amount_bar(df: pd.DataFrame, class_label: str, title: str) -> px.bar
 def category_pie(df: pd.DataFrame, class_label: str, title: str) -> px.pie:
     if df.empty:
         return px.pie(title=title)
-    data = df.copy()
-    data["value"] = _value_for_class(data, class_label)
-    grouped = (
-        data.groupby("category", dropna=False)["value"].sum().reset_index()
-    )
+    values = _value_for_class(df, class_label)
+    grouped = values.groupby(df["category"], dropna=False, observed=True).sum().reset_index(name="value")
     grouped = grouped[grouped["value"] != 0]
     fig = px.pie(
         grouped,
@@ -75,13 +87,13 @@ def category_pie(df: pd.DataFrame, class_label: str, title: str) -> px.pie:
 def weekday_average_bar(df: pd.DataFrame, title: str) -> px.bar:
     if df.empty:
         return px.bar(title=title)
-    ordered = pd.Categorical(df["weekday_name"], categories=WEEKDAY_ORDER, ordered=True)
-    data = df.copy()
-    data["weekday_name"] = ordered
-    data = data.dropna(subset=["weekday_name"])
-    data["value"] = -data["amount"].astype(float)
     averages = (
-        data.groupby("weekday_name", as_index=False)["value"].mean().sort_values("weekday_name")
+        (-df["amount"])
+        .groupby(df["weekday_name"], observed=False, sort=False)
+        .mean()
+        .reindex(WEEKDAY_ORDER)
+        .rename_axis("weekday_name")
+        .reset_index(name="value")
     )
     fig = px.bar(
         averages,
@@ -97,18 +109,25 @@ def weekday_average_bar(df: pd.DataFrame, title: str) -> px.bar:
 def net_worth_line(df: pd.DataFrame, title: str) -> px.line:
     if df.empty:
         return px.line(title=title)
-    data = df.copy().sort_values("date")
+    data = df.sort_values("date")
     if "balance" in data.columns and data["balance"].notna().any():
         networth = (
             data.dropna(subset=["balance"])
-            .groupby("date", as_index=False)["balance"]
+            .groupby("date", as_index=False, sort=False)["balance"]
             .last()
             .rename(columns={"balance": "net_worth"})
         )
     else:
-        cumulative = data.groupby("date", as_index=False)["amount"].sum()
+        cumulative = data.groupby("date", as_index=False, sort=False)["amount"].sum()
         cumulative["net_worth"] = cumulative["amount"].cumsum()
         networth = cumulative[["date", "net_worth"]]
+    if len(networth) > NET_WORTH_MAX_POINTS:
+        keep = _lttb_indices(
+            networth["date"].to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64),
+            networth["net_worth"].to_numpy(dtype=np.float64),
+            NET_WORTH_MAX_POINTS,
+        )
+        networth = networth.iloc[keep]
     fig = px.line(
         networth,
         x="date",
@@ -116,6 +135,7 @@ def net_worth_line(df: pd.DataFrame, title: str) -> px.line:
         title=title,
         labels={"date": "Date", "net_worth": "Net Worth ($)"},
         color_discrete_sequence=[CLASS_COLOR_MAP["Earnings"]],
+        render_mode="webgl" if len(networth) > WEBGL_MIN_POINTS else "svg",
     )
     fig.update_traces(mode="lines+markers")
     return fig
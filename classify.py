@@ -1,13 +1,19 @@
-import difflib
 import json
 import os
 import re
-from functools import lru_cache
-from typing import Dict, Optional, Tuple
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
 from urllib import error, request
 
+import ahocorasick
 import numpy as np
 import pandas as pd
+from rapidfuzz import fuzz, process
+
+from cleaning import WHITESPACE_PATTERN
 
 
 DEFAULT_MAPPING = {
@@ -78,41 +84,90 @@ FUZZY_TARGETS: Dict[str, Tuple[str, str]] = {
     "uber eats": ("Food & Drink", "Delivery"),
 }
 
+FUZZY_KEYS = list(FUZZY_TARGETS.keys())
+
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    automaton = ahocorasick.Automaton()
+    for priority, (keyword, mapping) in enumerate(DETERMINISTIC_KEYWORDS.items()):
+        automaton.add_word(keyword, (priority, mapping))
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+TOKEN_SPLIT_PATTERN = re.compile(r"[^\w&]+")
+
 API_URL = os.getenv("PF_CLASSIFY_API_URL")
 API_KEY = os.getenv("PF_CLASSIFY_API_KEY")
 API_TIMEOUT = 3
-
-
-def normalize(text: str) -> str:
-    lowered = text.lower()
-    lowered = re.sub(r"\s+", " ", lowered)
-    return lowered.strip()
+API_MAX_WORKERS = 8
+API_CACHE_PATH = os.getenv("PF_CLASSIFY_CACHE_PATH", ".pf_classify_cache.sqlite3")
+API_CACHE_TTL = 30 * 24 * 60 * 60
+API_CACHE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS enrichment ("
+    "description TEXT PRIMARY KEY, category TEXT, sub_category TEXT, fetched_at REAL NOT NULL)"
+)
 
 
 def deterministic_lookup(description: str) -> Optional[Tuple[str, str]]:
-    for keyword, mapping in DETERMINISTIC_KEYWORDS.items():
-        if keyword in description:
-            return mapping
-    return None
+    best = min((hit for _, hit in KEYWORD_AUTOMATON.iter(description)), default=None)
+    if best is None:
+        return None
+    return best[1]
 
 
 def fuzzy_lookup(description: str) -> Optional[Tuple[str, str]]:
-    tokens = [token for token in re.split(r"[^\w&]+", description) if token]
-    candidates = list(FUZZY_TARGETS.keys())
+    tokens = [token for token in TOKEN_SPLIT_PATTERN.split(description) if token]
     for token in tokens:
-        matches = difflib.get_close_matches(token, candidates, n=1, cutoff=0.92)
-        if matches:
-            return FUZZY_TARGETS[matches[0]]
-    matches = difflib.get_close_matches(description, candidates, n=1, cutoff=0.8)
-    if matches:
-        return FUZZY_TARGETS[matches[0]]
+        match = process.extractOne(token, FUZZY_KEYS, scorer=fuzz.ratio, score_cutoff=92)
+        if match:
+            return FUZZY_TARGETS[match[0]]
+    match = process.extractOne(description, FUZZY_KEYS, scorer=fuzz.ratio, score_cutoff=80)
+    if match:
+        return FUZZY_TARGETS[match[0]]
     return None
 
 
-@lru_cache(maxsize=128)
+def _read_api_cache(description: str) -> Tuple[bool, Optional[Tuple[str, str]]]:
+    try:
+        with closing(sqlite3.connect(API_CACHE_PATH, timeout=API_TIMEOUT)) as connection:
+            connection.execute(API_CACHE_SCHEMA)
+            row = connection.execute(
+                "SELECT category, sub_category FROM enrichment "
+                "WHERE description = ? AND fetched_at >= ?",
+                (description, time.time() - API_CACHE_TTL),
+            ).fetchone()
+    except sqlite3.Error:
+        return False, None
+    if row is None:
+        return False, None
+    if row[0] is None:
+        return True, None
+    return True, (row[0], row[1])
+
+
+def _write_api_cache(description: str, mapping: Optional[Tuple[str, str]]) -> None:
+    category, sub_category = mapping if mapping else (None, None)
+    try:
+        with closing(sqlite3.connect(API_CACHE_PATH, timeout=API_TIMEOUT)) as connection:
+            with connection:
+                connection.execute(API_CACHE_SCHEMA)
+                connection.execute(
+                    "INSERT OR REPLACE INTO enrichment VALUES (?, ?, ?, ?)",
+                    (description, category, sub_category, time.time()),
+                )
+    except sqlite3.Error:
+        pass
+
+
 def _call_enrichment_api(description: str) -> Optional[Tuple[str, str]]:
     if not API_URL or not API_KEY:
         return None
+    found, cached = _read_api_cache(description)
+    if found:
+        return cached
     payload = json.dumps({"description": description}).encode("utf-8")
     headers = {
         "Content-Type": "application/json",
@@ -124,18 +179,37 @@ def _call_enrichment_api(description: str) -> Optional[Tuple[str, str]]:
             if response.status >= 400:
                 return None
             data = json.loads(response.read().decode("utf-8"))
-            category = data.get("category")
-            sub_category = data.get("sub_category")
-            if category and sub_category:
-                return category, sub_category
-            if category:
-                return category, "Others"
-            return None
     except (error.URLError, ValueError, TimeoutError):
         return None
+    category = data.get("category")
+    sub_category = data.get("sub_category")
+    mapping = None
+    if category and sub_category:
+        mapping = (category, sub_category)
+    elif category:
+        mapping = (category, "Others")
+    _write_api_cache(description, mapping)
+    return mapping
+
+
+def _classify_one(normalized_description: str) -> Optional[Tuple[str, str]]:
+    mapping = deterministic_lookup(normalized_description)
+    if mapping is None:
+        mapping = fuzzy_lookup(normalized_description)
+    return mapping
 
 
-def classify_transactions(df: pd.DataFrame, use_api: bool = False) -> pd.DataFrame:
+def _enrich_descriptions(descriptions: List[str]) -> Dict[str, Optional[Tuple[str, str]]]:
+    if not descriptions or not API_URL or not API_KEY:
+        return {}
+    workers = min(API_MAX_WORKERS, len(descriptions))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(descriptions, executor.map(_call_enrichment_api, descriptions)))
+
+
+def classify_transactions(
+    df: pd.DataFrame, use_api: bool = False, copy: bool = True
+) -> pd.DataFrame:
     if df.empty:
         empty = df.copy()
         if "category" not in empty.columns:
@@ -144,28 +218,44 @@ def classify_transactions(df: pd.DataFrame, use_api: bool = False) -> pd.DataFra
             empty["sub_category"] = pd.Series(dtype="object")
         return empty
 
-    classified = df.copy()
+    classified = df.copy() if copy else df
     if "class" not in classified.columns:
         classified["class"] = np.where(classified["amount"] > 0, "Earnings", "Expenses")
 
-    categories = []
-    sub_categories = []
-
-    for description, row_class in zip(classified["description"], classified["class"]):
-        normalized_description = normalize(str(description))
-        mapping = deterministic_lookup(normalized_description)
-        if mapping is None:
-            mapping = fuzzy_lookup(normalized_description)
-        if mapping is None and use_api:
-            api_mapping = _call_enrichment_api(normalized_description)
-            if api_mapping:
-                mapping = api_mapping
-        if mapping is None:
-            fallback = DEFAULT_MAPPING.get(row_class, DEFAULT_MAPPING["Expenses"])
-            mapping = fallback
-        categories.append(mapping[0])
-        sub_categories.append(mapping[1])
-
-    classified["category"] = categories
-    classified["sub_category"] = sub_categories
+    normalized_descriptions = (
+        classified["description"]
+        .astype(str)
+        .str.lower()
+        .str.replace(WHITESPACE_PATTERN, " ", regex=True)
+        .str.strip()
+    )
+    mapping_by_description = {
+        description: _classify_one(description)
+        for description in normalized_descriptions.unique()
+    }
+    if use_api:
+        unmatched = [
+            description
+            for description, mapping in mapping_by_description.items()
+            if mapping is None
+        ]
+        mapping_by_description.update(_enrich_descriptions(unmatched))
+
+    matched = {
+        description: mapping
+        for description, mapping in mapping_by_description.items()
+        if mapping is not None
+    }
+    row_class = classified["class"].astype(str)
+    row_class = row_class.where(row_class.isin(list(DEFAULT_MAPPING)), "Expenses")
+    is_matched = normalized_descriptions.isin(list(matched)).to_numpy()
+
+    for position, column in enumerate(("category", "sub_category")):
+        found = normalized_descriptions.map(
+            {description: mapping[position] for description, mapping in matched.items()}
+        )
+        fallback = row_class.map(
+            {label: mapping[position] for label, mapping in DEFAULT_MAPPING.items()}
+        )
+        classified[column] = np.where(is_matched, found, fallback).astype(object)
     return classified
@@ -1,4 +1,5 @@
 import re
+from typing import List
 
 import numpy as np
 import pandas as pd
@@ -6,6 +7,18 @@ import pandas as pd
 
 CLASS_CATEGORIES = pd.CategoricalDtype(categories=["Earnings", "Expenses"], ordered=True)
 
+WEEKDAY_ORDER: List[str] = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+WEEKDAY_CATEGORIES = pd.CategoricalDtype(categories=WEEKDAY_ORDER, ordered=True)
+
 
 DESCRIPTION_TRAILING_PATTERNS = [
     r"\bref\.?\s?#?\d+$",
@@ -13,32 +26,46 @@ DESCRIPTION_TRAILING_PATTERNS = [
     r"\b\d{4,}$",
 ]
 
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+TRAILING_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in DESCRIPTION_TRAILING_PATTERNS
+]
+
 
-def standardize_description(text: str) -> str:
-    if not isinstance(text, str):
-        return ""
-    cleaned = text.strip()
-    cleaned = re.sub(r"\s+", " ", cleaned)
-    cleaned = cleaned.strip(". ")
-    for pattern in DESCRIPTION_TRAILING_PATTERNS:
-        cleaned = re.sub(pattern, "", cleaned, flags=re.IGNORECASE).strip()
+def standardize_descriptions(descriptions: pd.Series) -> pd.Series:
+    cleaned = (
+        descriptions.fillna("")
+        .astype(str)
+        .str.strip()
+        .str.replace(WHITESPACE_PATTERN, " ", regex=True)
+        .str.strip(". ")
+    )
+    for pattern in TRAILING_PATTERNS:
+        cleaned = cleaned.str.replace(pattern, "", regex=True).str.strip()
     return cleaned
 
 
+def month_labels(dates: pd.Series) -> pd.Series:
+    codes = dates.dt.year * 100 + dates.dt.month
+    labels = {code: f"{code // 100}-{code % 100:02d}" for code in codes.unique()}
+    return codes.map(labels)
+
+
 def clean_transactions(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     cleaned = df.copy()
-    cleaned = cleaned.drop_duplicates()
     cleaned["date"] = pd.to_datetime(cleaned["date"], errors="coerce")
-    cleaned["amount"] = pd.to_numeric(cleaned["amount"], errors="coerce")
+    cleaned["amount"] = pd.to_numeric(cleaned["amount"], errors="coerce").astype(np.float64)
     cleaned = cleaned.dropna(subset=["date", "amount"])
-    cleaned["description"] = cleaned["description"].fillna("").apply(standardize_description)
+    cleaned = cleaned.drop_duplicates()
+    cleaned["description"] = standardize_descriptions(cleaned["description"])
     cleaned["account_name"] = cleaned["account_name"].fillna("chequing").str.lower()
     if "balance" in cleaned.columns:
         cleaned["balance"] = pd.to_numeric(cleaned["balance"], errors="coerce")
     cleaned["class"] = np.where(cleaned["amount"] > 0, "Earnings", "Expenses")
     cleaned["class"] = cleaned["class"].astype(CLASS_CATEGORIES)
-    cleaned["weekday_name"] = cleaned["date"].dt.day_name()
-    cleaned["month"] = cleaned["date"].dt.to_period("M").astype(str)
+    cleaned["weekday_name"] = cleaned["date"].dt.day_name().astype(WEEKDAY_CATEGORIES)
+    cleaned["month"] = month_labels(cleaned["date"])
     return cleaned.reset_index(drop=True)
@@ -1,14 +1,22 @@
 import codecs
 import csv
+import hashlib
 import io
 import re
-from typing import Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Iterable, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
+from cleaning import WHITESPACE_PATTERN
+
 
 CANONICAL_COLUMNS = ["date", "description", "amount", "account_name", "balance"]
 
+MAX_PARSE_WORKERS = 8
+
+ENCODING_SAMPLE_BYTES = 65536
+
 DATE_CANDIDATES = [
     "date",
     "transaction date",
@@ -55,12 +63,21 @@ TRANSFER_KEYWORDS = [
 
 INTERNAL_TRANSFER_DESCRIPTIONS = {"customer transfer cr.", "customer transfer dr."}
 
+NON_ASCII_PRINTABLE_PATTERN = re.compile(r"[^\x20-\x7e]")
+
+TRANSFER_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in TRANSFER_KEYWORDS))
+
+NUMERIC_TRANSLATION = str.maketrans({",": None, "$": None, "(": "-", ")": None})
+
 
 def detect_encoding(raw_bytes: bytes) -> str:
     if raw_bytes.startswith(codecs.BOM_UTF16_LE):
         return "utf-16"
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
     try:
-        raw_bytes.decode("utf-8-sig")
+        decoder.decode(
+            raw_bytes[:ENCODING_SAMPLE_BYTES], final=len(raw_bytes) <= ENCODING_SAMPLE_BYTES
+        )
         return "utf-8-sig"
     except UnicodeDecodeError:
         return "latin-1"
@@ -91,47 +108,41 @@ def infer_account_name(file_name: Optional[str], account_column: Optional[pd.Ser
     return "chequing"
 
 
-def _clean_string(value: Optional[str]) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, float):
-        if pd.isna(value):
-            return ""
-        value = str(value)
-    elif not isinstance(value, str):
-        value = str(value)
-    value = value.replace("\xa0", " ").strip()
-    value = re.sub(r"\s+", " ", value)
-    printable = "".join(ch for ch in value if ch.isprintable())
-    return printable.strip()
-
-
-def _clean_numeric(value: str) -> Optional[float]:
-    if value is None:
-        return None
-    value = str(value).strip()
-    if not value:
-        return None
-    value = value.replace(",", "").replace("$", "")
-    value = value.replace("(", "-").replace(")", "")
-    try:
-        return float(value)
-    except ValueError:
-        return None
+def _clean_string_series(values: pd.Series) -> pd.Series:
+    cleaned = (
+        values.fillna("")
+        .astype(str)
+        .str.replace("\xa0", " ", regex=False)
+        .str.strip()
+        .str.replace(WHITESPACE_PATTERN, " ", regex=True)
+    )
+    needs_filter = cleaned.str.contains(NON_ASCII_PRINTABLE_PATTERN)
+    if needs_filter.any():
+        cleaned[needs_filter] = cleaned[needs_filter].map(
+            lambda value: "".join(ch for ch in value if ch.isprintable())
+        )
+    return cleaned.str.strip()
+
+
+def _clean_numeric_series(values: pd.Series) -> pd.Series:
+    cleaned = values.fillna("").astype(str).str.strip().str.translate(NUMERIC_TRANSLATION)
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
 
 
 def _normalize_columns(columns: Sequence[str]) -> List[str]:
     normalized = []
     for col in columns:
         col = col.strip().lower()
-        col = re.sub(r"\s+", " ", col)
+        col = WHITESPACE_PATTERN.sub(" ", col)
         normalized.append(col)
     return normalized
 
 
-def _find_first_match(columns: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+def _find_first_match(
+    columns: Sequence[str], candidates: Sequence[str], column_set: AbstractSet[str]
+) -> Optional[str]:
     for candidate in candidates:
-        if candidate in columns:
+        if candidate in column_set:
             return candidate
     for candidate in candidates:
         for col in columns:
@@ -142,21 +153,29 @@ def _find_first_match(columns: Sequence[str], candidates: Sequence[str]) -> Opti
 
 def read_scotiabank_csv(raw_bytes: bytes, file_name: Optional[str] = None) -> pd.DataFrame:
     encoding = detect_encoding(raw_bytes)
-    decoded = raw_bytes.decode(encoding, errors="ignore")
-    sample = decoded[:4096]
+    sample = raw_bytes[:4096].decode(encoding, errors="ignore")
     delimiter = detect_delimiter(sample)
-    csv_buffer = io.StringIO(decoded)
-    df = pd.read_csv(csv_buffer, delimiter=delimiter, dtype=str).dropna(how="all")
+    df = pd.read_csv(
+        io.BytesIO(raw_bytes),
+        delimiter=delimiter,
+        dtype=str,
+        encoding=encoding,
+        encoding_errors="ignore",
+        engine="c",
+        low_memory=False,
+    ).dropna(how="all")
     df.columns = _normalize_columns(df.columns)
+    columns = list(df.columns)
+    column_set = set(columns)
 
-    date_column = _find_first_match(df.columns, DATE_CANDIDATES)
-    description_column = _find_first_match(df.columns, DESCRIPTION_CANDIDATES)
-    balance_column = _find_first_match(df.columns, BALANCE_CANDIDATES)
-    account_column_name = _find_first_match(df.columns, ACCOUNT_CANDIDATES)
-    amount_column = _find_first_match(df.columns, AMOUNT_CANDIDATES)
+    date_column = _find_first_match(columns, DATE_CANDIDATES, column_set)
+    description_column = _find_first_match(columns, DESCRIPTION_CANDIDATES, column_set)
+    balance_column = _find_first_match(columns, BALANCE_CANDIDATES, column_set)
+    account_column_name = _find_first_match(columns, ACCOUNT_CANDIDATES, column_set)
+    amount_column = _find_first_match(columns, AMOUNT_CANDIDATES, column_set)
 
-    debit_column = _find_first_match(df.columns, DEBIT_CANDIDATES)
-    credit_column = _find_first_match(df.columns, CREDIT_CANDIDATES)
+    debit_column = _find_first_match(columns, DEBIT_CANDIDATES, column_set)
+    credit_column = _find_first_match(columns, CREDIT_CANDIDATES, column_set)
 
     if date_column is None or description_column is None:
         raise ValueError("Required columns not found in uploaded file.")
@@ -166,14 +185,14 @@ def read_scotiabank_csv(raw_bytes: bytes, file_name: Optional[str] = None) -> pd
 
     normalized = pd.DataFrame()
     normalized["date"] = pd.to_datetime(df[date_column], errors="coerce")
-    normalized["description"] = df[description_column].apply(_clean_string)
+    normalized["description"] = _clean_string_series(df[description_column])
 
     amount_values: Optional[pd.Series] = None
     if amount_column:
-        amount_values = df[amount_column].apply(_clean_numeric)
+        amount_values = _clean_numeric_series(df[amount_column])
     elif debit_column or credit_column:
-        debit_series = df[debit_column].apply(_clean_numeric) if debit_column else None
-        credit_series = df[credit_column].apply(_clean_numeric) if credit_column else None
+        debit_series = _clean_numeric_series(df[debit_column]) if debit_column else None
+        credit_series = _clean_numeric_series(df[credit_column]) if credit_column else None
         amount_values = pd.Series(0.0, index=df.index, dtype="float64")
         if debit_series is not None:
             amount_values = amount_values - debit_series.fillna(0.0)
@@ -186,9 +205,7 @@ def read_scotiabank_csv(raw_bytes: bytes, file_name: Optional[str] = None) -> pd
     normalized["account_name"] = account_name
 
     if balance_column:
-        normalized["balance"] = pd.to_numeric(
-            df[balance_column].apply(_clean_numeric), errors="coerce"
-        )
+        normalized["balance"] = _clean_numeric_series(df[balance_column])
     else:
         normalized["balance"] = pd.NA
 
@@ -198,78 +215,117 @@ def read_scotiabank_csv(raw_bytes: bytes, file_name: Optional[str] = None) -> pd
 
 
 def load_and_normalize_files(file_payloads: Iterable[Tuple[str, bytes]]) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
-    for file_name, content in file_payloads:
-        frame = read_scotiabank_csv(content, file_name=file_name)
-        frames.append(frame)
-    if not frames:
+    payloads = list(file_payloads)
+    if not payloads:
         return pd.DataFrame(columns=CANONICAL_COLUMNS)
+    workers = min(MAX_PARSE_WORKERS, len(payloads))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames: List[pd.DataFrame] = list(
+            executor.map(
+                lambda payload: read_scotiabank_csv(payload[1], file_name=payload[0]),
+                payloads,
+            )
+        )
     combined = pd.concat(frames, ignore_index=True)
     combined = remove_internal_transfers(combined)
     return combined
 
 
-def _matches_transfer_keyword(text: str) -> bool:
-    lowered = text.lower()
-    return any(keyword in lowered for keyword in TRANSFER_KEYWORDS)
-
-
 def remove_internal_transfers(df: pd.DataFrame, tolerance_days: int = 2) -> pd.DataFrame:
     if df.empty:
         return df
     working = df.copy().reset_index(drop=True)
-    working["description_lower"] = working["description"].str.lower()
-    mask_customer = working["description_lower"].isin(
-        tuple(desc.lower() for desc in INTERNAL_TRANSFER_DESCRIPTIONS)
-    )
+    lowered = working["description"].astype(str).str.lower()
+    mask_customer = lowered.isin({desc.lower() for desc in INTERNAL_TRANSFER_DESCRIPTIONS})
+    working["transfer_flag"] = lowered.str.contains(TRANSFER_PATTERN, na=False)
     working = working[~mask_customer]
 
-    working["transfer_flag"] = working["description"].apply(
-        lambda desc: _matches_transfer_keyword(desc if isinstance(desc, str) else "")
-    )
     working["abs_amount"] = working["amount"].abs().round(2)
 
-    positives = working[(working["amount"] > 0) & working["transfer_flag"]]
-    negatives = working[(working["amount"] < 0) & working["transfer_flag"]]
+    candidates = working["transfer_flag"] & working["date"].notna()
+    positives = working[(working["amount"] > 0) & candidates]
+    negatives = working[(working["amount"] < 0) & candidates]
 
     if positives.empty or negatives.empty:
-        cleaned = working.drop(columns=["description_lower", "transfer_flag", "abs_amount"])
+        cleaned = working.drop(columns=["transfer_flag", "abs_amount"])
         return cleaned.reset_index(drop=True)
 
-    positives = positives.assign(pair_index=positives.index)
-    negatives = negatives.assign(pair_index=negatives.index)
-
-    potential_pairs = positives.merge(
-        negatives,
-        on="abs_amount",
-        suffixes=("_pos", "_neg"),
+    positives = (
+        positives[["date", "abs_amount"]]
+        .assign(pair_index_pos=positives.index)
+        .sort_values("date", kind="mergesort")
+    )
+    negatives = (
+        negatives[["date", "abs_amount"]]
+        .assign(pair_index_neg=negatives.index, date_neg=negatives["date"])
+        .sort_values("date", kind="mergesort")
     )
-    if potential_pairs.empty:
-        cleaned = working.drop(columns=["description_lower", "transfer_flag", "abs_amount"])
-        return cleaned.reset_index(drop=True)
-
-    potential_pairs["date_diff"] = (potential_pairs["date_pos"] - potential_pairs["date_neg"]).abs()
-    potential_pairs = potential_pairs[
-        potential_pairs["date_diff"] <= pd.Timedelta(days=tolerance_days)
-    ]
-    potential_pairs = potential_pairs.sort_values("date_diff")
 
+    tolerance = pd.Timedelta(days=tolerance_days)
     to_drop = set()
-    used_pos = set()
-    used_neg = set()
-
-    for _, row in potential_pairs.iterrows():
-        pos_idx = int(row["pair_index_pos"])
-        neg_idx = int(row["pair_index_neg"])
-        if pos_idx in used_pos or neg_idx in used_neg:
-            continue
-        used_pos.add(pos_idx)
-        used_neg.add(neg_idx)
-        to_drop.add(pos_idx)
-        to_drop.add(neg_idx)
+    while not positives.empty and not negatives.empty:
+        # Each credit looks up its nearest same-amount debit; when several credits
+        # land on the same debit the closest one wins and the others retry.
+        nearest = pd.merge_asof(
+            positives,
+            negatives,
+            on="date",
+            by="abs_amount",
+            tolerance=tolerance,
+            direction="nearest",
+        ).dropna(subset=["pair_index_neg"])
+        if nearest.empty:
+            break
+        nearest["date_diff"] = (nearest["date"] - nearest["date_neg"]).abs()
+
+        # Identical credits (same amount and date) all pick the same debit, so a plain
+        # round settles one of them at a time. When a credit date targets a debit date
+        # that no other credit date can reach, and the credit date is either used up
+        # by it or cannot reach any other debit date, the rounds would pair the two
+        # groups row by row without touching anything else; pair them by rank at once.
+        credit_days = positives.groupby(["abs_amount", "date"]).size().rename("credit_count")
+        debit_days = negatives.groupby(["abs_amount", "date_neg"]).size().rename("debit_count")
+        reach = credit_days.reset_index().merge(debit_days.reset_index(), on="abs_amount")
+        reach = reach[(reach["date"] - reach["date_neg"]).abs() <= tolerance]
+        credit_reach = reach.groupby(["abs_amount", "date"])["date_neg"].transform("size")
+        debit_reach = reach.groupby(["abs_amount", "date_neg"])["date"].transform("size")
+        isolated = reach[
+            (debit_reach == 1)
+            & ((reach["credit_count"] <= reach["debit_count"]) | (credit_reach == 1))
+        ]
+        bulk = (
+            nearest.merge(
+                isolated[["abs_amount", "date", "date_neg"]],
+                on=["abs_amount", "date", "date_neg"],
+                how="left",
+                indicator=True,
+            )["_merge"]
+            == "both"
+        ).to_numpy()
+
+        bulk_credits = nearest.loc[bulk, ["abs_amount", "date", "date_neg", "pair_index_pos"]]
+        bulk_debits = negatives.merge(
+            bulk_credits[["abs_amount", "date_neg"]].drop_duplicates(), on=["abs_amount", "date_neg"]
+        )
+        bulk_pairs = bulk_credits.assign(
+            pair_rank=bulk_credits.groupby(["abs_amount", "date"]).cumcount()
+        ).merge(
+            bulk_debits[["abs_amount", "date_neg", "pair_index_neg"]].assign(
+                pair_rank=bulk_debits.groupby(["abs_amount", "date_neg"]).cumcount()
+            ),
+            on=["abs_amount", "date_neg", "pair_rank"],
+        )
+        contested_pairs = (
+            nearest[~bulk].sort_values("date_diff", kind="mergesort").drop_duplicates("pair_index_neg")
+        )
+        matched = pd.concat([bulk_pairs, contested_pairs], ignore_index=True)
+        to_drop.update(matched["pair_index_pos"].astype(int).tolist())
+        to_drop.update(matched["pair_index_neg"].astype(int).tolist())
+        positives = positives[~positives["pair_index_pos"].isin(matched["pair_index_pos"])]
+        negatives = negatives[~negatives["pair_index_neg"].isin(matched["pair_index_neg"])]
 
     working = working.drop(index=list(to_drop))
-    working = working.drop(columns=["description_lower", "transfer_flag", "abs_amount"])
+    working = working.drop(columns=["transfer_flag", "abs_amount"])
     return working.reset_index(drop=True)
 
 
@@ -282,6 +338,17 @@ def serialize_uploaded_files(files: Sequence) -> Tuple[Tuple[str, bytes], ...]:
     return tuple(serialized)
 
 
+def digest_uploaded_files(files: Sequence) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        name = getattr(file, "name", "upload.csv")
+        content = file.getbuffer()
+        digest.update(name.encode("utf-8"))
+        digest.update(len(content).to_bytes(8, "little"))
+        digest.update(content)
+    return digest.hexdigest()
+
+
 def snapshot_file_list(files: Sequence) -> str:
     names = [getattr(file, "name", "upload.csv") for file in files]
     return ", ".join(names)
@@ -1,15 +1,16 @@
 import datetime as dt
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import pandas as pd
+import plotly.graph_objects as go
 import streamlit as st
 
 from charts import category_pie, monthly_amount_bar, net_worth_line, weekday_average_bar
 from cleaning import clean_transactions
 from classify import classify_transactions
 from io_utils import (
+    digest_uploaded_files,
     load_and_normalize_files,
-    read_scotiabank_csv,
     serialize_uploaded_files,
     snapshot_file_list,
 )
@@ -18,74 +19,149 @@ from io_utils import (
 st.set_page_config(page_title="Personal Finance Dashboard", layout="wide")
 
 
-SAMPLE_DATA = """Date,Description,Debit,Credit,Balance
-2024-01-02,Payroll Deposit,,2800.00,4200.55
-2024-01-03,Tim Hortons,4.58,,4195.97
-2024-01-04,Rent Downtown Apt,1800.00,,2395.97
-2024-01-05,Uber Trip 1234,18.25,,2377.72
-2024-01-05,Scotia Savings Transfer,,300.00,2677.72
-2024-01-05,Scotia Savings Transfer,300.00,,2377.72
-2024-01-06,Groceries - Loblaws,126.38,,2251.34
-2024-01-07,Netflix.com,16.99,,2234.35
-2024-01-08,Costco Wholesale,210.45,,2023.90
-2024-01-10,Shell Canada,62.44,,1961.46
-2024-01-15,Insurance Premium,95.12,,1866.34
-2024-01-20,Interest Payment,,4.22,1870.56
-2024-01-23,Rogers Communications,89.50,,1781.06
-2024-01-25,Starbucks Coffee,8.76,,1772.30
-2024-01-28,Side Gig Payment,,420.00,2192.30
-2024-02-02,Payroll Deposit,,2800.00,4992.30
-2024-02-03,Groceries - No Frills,135.12,,4857.18
-2024-02-04,Uber Eats,32.55,,4824.63
-2024-02-05,Mortgage Payment,1600.00,,3224.63
-2024-02-07,Hydro One,82.30,,3142.33
-2024-02-09,Spotify P07,11.99,,3130.34
-2024-02-10,Costco Wholesale,195.75,,2934.59
-2024-02-12,Interest Payment,,4.45,2939.04
-2024-02-15,Scotia Visa Payment,450.00,,2489.04
-2024-02-18,Shoppers Drug Mart,47.33,,2441.71
-2024-02-20,Airbnb Booking,320.00,,2121.71
-2024-02-22,Amazon Marketplace,68.90,,2052.81
-2024-02-25,Side Gig Payment,,460.00,2512.81
-"""
-
-
-@st.cache_data(show_spinner=False)
+SAMPLE_ROWS = [
+    ("2024-01-02", "Payroll Deposit", 2800.00, 4200.55),
+    ("2024-01-03", "Tim Hortons", -4.58, 4195.97),
+    ("2024-01-04", "Rent Downtown Apt", -1800.00, 2395.97),
+    ("2024-01-05", "Uber Trip 1234", -18.25, 2377.72),
+    ("2024-01-05", "Scotia Savings Transfer", 300.00, 2677.72),
+    ("2024-01-05", "Scotia Savings Transfer", -300.00, 2377.72),
+    ("2024-01-06", "Groceries - Loblaws", -126.38, 2251.34),
+    ("2024-01-07", "Netflix.com", -16.99, 2234.35),
+    ("2024-01-08", "Costco Wholesale", -210.45, 2023.90),
+    ("2024-01-10", "Shell Canada", -62.44, 1961.46),
+    ("2024-01-15", "Insurance Premium", -95.12, 1866.34),
+    ("2024-01-20", "Interest Payment", 4.22, 1870.56),
+    ("2024-01-23", "Rogers Communications", -89.50, 1781.06),
+    ("2024-01-25", "Starbucks Coffee", -8.76, 1772.30),
+    ("2024-01-28", "Side Gig Payment", 420.00, 2192.30),
+    ("2024-02-02", "Payroll Deposit", 2800.00, 4992.30),
+    ("2024-02-03", "Groceries - No Frills", -135.12, 4857.18),
+    ("2024-02-04", "Uber Eats", -32.55, 4824.63),
+    ("2024-02-05", "Mortgage Payment", -1600.00, 3224.63),
+    ("2024-02-07", "Hydro One", -82.30, 3142.33),
+    ("2024-02-09", "Spotify P07", -11.99, 3130.34),
+    ("2024-02-10", "Costco Wholesale", -195.75, 2934.59),
+    ("2024-02-12", "Interest Payment", 4.45, 2939.04),
+    ("2024-02-15", "Scotia Visa Payment", -450.00, 2489.04),
+    ("2024-02-18", "Shoppers Drug Mart", -47.33, 2441.71),
+    ("2024-02-20", "Airbnb Booking", -320.00, 2121.71),
+    ("2024-02-22", "Amazon Marketplace", -68.90, 2052.81),
+    ("2024-02-25", "Side Gig Payment", 460.00, 2512.81),
+]
+
+SAMPLE_DATA = pd.DataFrame(
+    {
+        "date": pd.to_datetime([row[0] for row in SAMPLE_ROWS]),
+        "description": [row[1] for row in SAMPLE_ROWS],
+        "amount": [row[2] for row in SAMPLE_ROWS],
+        "account_name": "chequing",
+        "balance": [row[3] for row in SAMPLE_ROWS],
+    }
+)
+
+TABLE_PREVIEW_ROWS = 500
+
+ACCEPTANCE_DATA = pd.DataFrame(
+    {
+        "date": ["2024-01-02", "2024-01-03", "2024-01-04"],
+        "description": ["Payroll Deposit", "Tim Hortons", "Corner Store"],
+        "amount": [2800.00, -4.58, -25.00],
+        "account_name": ["chequing", "chequing", "chequing"],
+        "balance": [2800.00, 2795.42, 2770.42],
+    }
+)
+
+
 def load_sample_data() -> pd.DataFrame:
-    return read_scotiabank_csv(SAMPLE_DATA.encode("utf-8"), file_name="sample.csv")
+    return SAMPLE_DATA.copy()
+
+
+@st.cache_data(show_spinner=False, persist="disk", max_entries=16)
+def ingest_uploaded_files(_files: Sequence, digest: str) -> pd.DataFrame:
+    return load_and_normalize_files(serialize_uploaded_files(_files))
+
+
+def _dataframe_fingerprint(df: pd.DataFrame) -> Tuple:
+    return (
+        df.shape,
+        tuple(df.columns),
+        pd.util.hash_pandas_object(df, index=False).values.tobytes(),
+    )
+
+
+DATAFRAME_HASH_FUNCS = {pd.DataFrame: _dataframe_fingerprint}
 
 
-@st.cache_data(show_spinner=False)
-def ingest_uploaded_files(serialized_files: Tuple[Tuple[str, bytes], ...]) -> pd.DataFrame:
-    return load_and_normalize_files(serialized_files)
+def _transform_pipeline(df: pd.DataFrame, use_api: bool) -> pd.DataFrame:
+    # clean_transactions already returns a fresh frame, so classification can fill it in place.
+    return df.pipe(clean_transactions).pipe(classify_transactions, use_api=use_api, copy=False)
 
 
-@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: lambda df: df.to_csv(index=False)})
+@st.cache_data(show_spinner=False, hash_funcs=DATAFRAME_HASH_FUNCS)
 def transform_dataset(raw_df: pd.DataFrame, use_api: bool) -> pd.DataFrame:
-    cleaned = clean_transactions(raw_df)
-    classified = classify_transactions(cleaned, use_api=use_api)
+    classified = _transform_pipeline(raw_df, use_api)
+    for column in ("category", "sub_category", "account_name"):
+        classified[column] = classified[column].astype("category")
+    classified = classified.sort_values("date", kind="mergesort").reset_index(drop=True)
     return classified
 
 
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS)
+def cached_monthly_amount_bar(df: pd.DataFrame, class_label: str, title: str) -> go.Figure:
+    return monthly_amount_bar(df, class_label, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS)
+def cached_category_pie(df: pd.DataFrame, class_label: str, title: str) -> go.Figure:
+    return category_pie(df, class_label, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS)
+def cached_weekday_average_bar(df: pd.DataFrame, title: str) -> go.Figure:
+    return weekday_average_bar(df, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=DATAFRAME_HASH_FUNCS)
+def cached_net_worth_line(df: pd.DataFrame, title: str) -> go.Figure:
+    return net_worth_line(df, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=16, hash_funcs=DATAFRAME_HASH_FUNCS)
+def dataframe_csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+
 def format_currency(value: float) -> str:
     return f"${value:,.2f}"
 
 
-def ensure_state_defaults(min_date: pd.Timestamp, max_date: pd.Timestamp) -> None:
-    start_dt = dt.datetime.combine(min_date.date(), dt.time.min)
-    end_dt = dt.datetime.combine(max_date.date(), dt.time.max)
+def render_table(df: pd.DataFrame, file_name: str) -> None:
+    # Only the preview is serialized to the browser; the full rows are offered as CSV.
+    st.dataframe(df.head(TABLE_PREVIEW_ROWS), use_container_width=True, hide_index=True)
+    if len(df) > TABLE_PREVIEW_ROWS:
+        st.caption(
+            f"Showing {TABLE_PREVIEW_ROWS:,} of {len(df):,} rows. Download the CSV for the full data."
+        )
+        st.download_button(
+            "Download CSV",
+            data=dataframe_csv_bytes(df),
+            file_name=file_name,
+            mime="text/csv",
+            key=f"download_{file_name}",
+        )
+
+
+def ensure_state_defaults(min_dt: dt.datetime, max_dt: dt.datetime) -> None:
     if "date_picker" not in st.session_state:
-        st.session_state["date_picker"] = (min_date.date(), max_date.date())
+        st.session_state["date_picker"] = (min_dt.date(), max_dt.date())
     if "date_slider" not in st.session_state:
-        st.session_state["date_slider"] = (start_dt, end_dt)
+        st.session_state["date_slider"] = (min_dt, max_dt)
 
 
-def set_full_period(min_date: pd.Timestamp, max_date: pd.Timestamp) -> None:
-    st.session_state["date_picker"] = (min_date.date(), max_date.date())
-    st.session_state["date_slider"] = (
-        dt.datetime.combine(min_date.date(), dt.time.min),
-        dt.datetime.combine(max_date.date(), dt.time.max),
-    )
+def set_full_period(min_dt: dt.datetime, max_dt: dt.datetime) -> None:
+    st.session_state["date_picker"] = (min_dt.date(), max_dt.date())
+    st.session_state["date_slider"] = (min_dt, max_dt)
 
 
 def on_date_picker_change() -> None:
@@ -109,6 +185,15 @@ def on_slider_change() -> None:
         st.session_state["date_picker"] = new_picker
 
 
+def store_dataset(df: pd.DataFrame, label: str, signature: str) -> None:
+    # The signature identifies the data contents and keys the cross-session caches.
+    st.session_state["raw_df"] = df
+    st.session_state["data_source"] = label
+    st.session_state["data_signature"] = signature
+    # The date range is reset once the new data has been transformed in main.
+    st.session_state["reset_period"] = True
+
+
 def hero_section() -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     st.title("Personal Finance Dashboard")
     source_label = st.session_state.get("data_source", "No data loaded")
@@ -130,96 +215,134 @@ def hero_section() -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         sample_clicked = st.button("Use sample data", use_container_width=True)
     if sample_clicked:
         sample_df = load_sample_data()
-        st.session_state["raw_df"] = sample_df
-        st.session_state["data_source"] = "Sample dataset"
-        st.session_state["data_signature"] = None
+        store_dataset(sample_df, "Sample dataset", "sample")
         return sample_df, "Sample dataset"
 
     if uploaded_files:
-        serialized = serialize_uploaded_files(uploaded_files)
-        uploaded_df = ingest_uploaded_files(serialized)
-        label = f"Uploaded files: {snapshot_file_list(uploaded_files)}"
-        st.session_state["raw_df"] = uploaded_df
-        st.session_state["data_source"] = label
-        st.session_state["data_signature"] = None
-        return uploaded_df, label
+        digest = digest_uploaded_files(uploaded_files)
+        if st.session_state.get("data_signature") != digest:
+            uploaded_df = ingest_uploaded_files(uploaded_files, digest)
+            label = f"Uploaded files: {snapshot_file_list(uploaded_files)}"
+            store_dataset(uploaded_df, label, digest)
+            return uploaded_df, label
 
     raw_df = st.session_state.get("raw_df")
     label = st.session_state.get("data_source")
     return raw_df, label
 
 
+def dataset_key() -> Tuple:
+    return (
+        st.session_state.get("data_source"),
+        st.session_state.get("data_signature"),
+        st.session_state.get("use_api_toggle", False),
+    )
+
+
+def _selection(state_key: str) -> Tuple[str, ...]:
+    return tuple(sorted(st.session_state.get(state_key) or ()))
+
+
 def filter_dataset(df: pd.DataFrame) -> pd.DataFrame:
     start_dt, end_dt = st.session_state["date_slider"]
-    filtered = df[(df["date"] >= start_dt) & (df["date"] <= end_dt)]
+    return apply_filters(
+        df,
+        dataset_key(),
+        start_dt,
+        end_dt,
+        _selection("filter_class"),
+        _selection("filter_category"),
+        _selection("filter_sub_category"),
+        _selection("filter_account"),
+    )
 
-    selected_class = st.session_state.get("filter_class")
-    if selected_class:
-        filtered = filtered[filtered["class"].isin(selected_class)]
 
-    selected_category = st.session_state.get("filter_category")
+@st.cache_data(show_spinner=False, max_entries=32)
+def apply_filters(
+    _df: pd.DataFrame,
+    key: Tuple,
+    start_dt: dt.datetime,
+    end_dt: dt.datetime,
+    selected_class: Tuple[str, ...],
+    selected_category: Tuple[str, ...],
+    selected_sub_category: Tuple[str, ...],
+    selected_account: Tuple[str, ...],
+) -> pd.DataFrame:
+    # transform_dataset sorts by date, so the date range is a contiguous slice.
+    lower = _df["date"].searchsorted(start_dt, side="left")
+    upper = _df["date"].searchsorted(end_dt, side="right")
+    window = _df.iloc[lower:upper]
+    mask = pd.Series(True, index=window.index)
+    if selected_class:
+        mask &= window["class"].isin(selected_class)
     if selected_category:
-        filtered = filtered[filtered["category"].isin(selected_category)]
-
-    selected_sub_category = st.session_state.get("filter_sub_category")
+        mask &= window["category"].isin(selected_category)
     if selected_sub_category:
-        filtered = filtered[filtered["sub_category"].isin(selected_sub_category)]
-
-    selected_account = st.session_state.get("filter_account")
+        mask &= window["sub_category"].isin(selected_sub_category)
     if selected_account:
-        filtered = filtered[filtered["account_name"].isin(selected_account)]
-    return filtered
+        mask &= window["account_name"].isin(selected_account)
+    return window.loc[mask]
+
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def filter_options(_df: pd.DataFrame, key: Tuple) -> Dict[str, List[str]]:
+    return {
+        column: sorted(_df[column].dropna().unique().tolist())
+        for column in ("class", "category", "sub_category", "account_name")
+    }
 
-def render_filter_widgets(df: pd.DataFrame, min_date: pd.Timestamp, max_date: pd.Timestamp) -> None:
+
+def render_filter_widgets(df: pd.DataFrame, min_dt: dt.datetime, max_dt: dt.datetime) -> None:
     with st.sidebar:
-        ensure_state_defaults(min_date, max_date)
+        ensure_state_defaults(min_dt, max_dt)
 
         st.button(
             "Select full period",
             on_click=set_full_period,
-            args=(min_date, max_date),
+            args=(min_dt, max_dt),
             use_container_width=True,
         )
         st.date_input(
             "Date range",
             value=st.session_state["date_picker"],
-            min_value=min_date.date(),
-            max_value=max_date.date(),
+            min_value=min_dt.date(),
+            max_value=max_dt.date(),
             key="date_picker",
             on_change=on_date_picker_change,
         )
         st.slider(
             "Timeline",
-            min_value=dt.datetime.combine(min_date.date(), dt.time.min),
-            max_value=dt.datetime.combine(max_date.date(), dt.time.max),
+            min_value=min_dt,
+            max_value=max_dt,
             value=st.session_state["date_slider"],
             key="date_slider",
             on_change=on_slider_change,
         )
 
-        class_options = sorted(df["class"].dropna().unique().tolist())
+        options = filter_options(df, dataset_key())
+
+        class_options = options["class"]
         st.session_state["filter_class"] = st.multiselect(
             "Class",
             options=class_options,
             default=class_options,
         )
 
-        category_options = sorted(df["category"].dropna().unique().tolist())
+        category_options = options["category"]
         st.session_state["filter_category"] = st.multiselect(
             "Category",
             options=category_options,
             default=category_options,
         )
 
-        sub_options = sorted(df["sub_category"].dropna().unique().tolist())
+        sub_options = options["sub_category"]
         st.session_state["filter_sub_category"] = st.multiselect(
             "Sub-category",
             options=sub_options,
             default=sub_options,
         )
 
-        account_options = sorted(df["account_name"].dropna().unique().tolist())
+        account_options = options["account_name"]
         st.session_state["filter_account"] = st.multiselect(
             "Account",
             options=account_options,
@@ -228,54 +351,54 @@ def render_filter_widgets(df: pd.DataFrame, min_date: pd.Timestamp, max_date: pd
 
 
 def kpi_section(filtered: pd.DataFrame) -> None:
-    earnings = filtered[filtered["class"] == "Earnings"]["amount"].sum()
-    expenses = filtered[filtered["class"] == "Expenses"]["amount"].sum()
+    totals = filtered.groupby("class", observed=True)["amount"].agg(["sum", "count"])
+    earnings = totals["sum"].get("Earnings", 0.0)
+    expenses = totals["sum"].get("Expenses", 0.0)
+    expense_count = totals["count"].get("Expenses", 0)
     delta = earnings + expenses
-    mean_purchase = (
-        filtered[filtered["class"] == "Expenses"]["amount"].apply(abs).mean()
-    )
+    # Expense amounts are never positive, so the mean purchase is the negated average.
+    mean_purchase = float(-expenses / expense_count) if expense_count else 0.0
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Earnings", format_currency(earnings))
     col2.metric("Total Expenses", format_currency(abs(expenses)))
     col3.metric("Delta", format_currency(delta))
-    col4.metric(
-        "Average Purchase Amount",
-        format_currency(mean_purchase if not pd.isna(mean_purchase) else 0.0),
-    )
+    col4.metric("Average Purchase Amount", format_currency(mean_purchase))
 
 
+@st.fragment
 def expenses_section(expenses_df: pd.DataFrame) -> None:
     st.subheader("Expenses")
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(monthly_amount_bar(expenses_df, "Expenses", "Monthly Expenses"), use_container_width=True)
+        st.plotly_chart(cached_monthly_amount_bar(expenses_df, "Expenses", "Monthly Expenses"), use_container_width=True)
     with col2:
-        st.plotly_chart(category_pie(expenses_df, "Expenses", "Expenses by Category"), use_container_width=True)
+        st.plotly_chart(cached_category_pie(expenses_df, "Expenses", "Expenses by Category"), use_container_width=True)
 
-    st.plotly_chart(weekday_average_bar(expenses_df, "Average Expense by Weekday"), use_container_width=True)
+    st.plotly_chart(cached_weekday_average_bar(expenses_df, "Average Expense by Weekday"), use_container_width=True)
 
     with st.expander("Expense transactions", expanded=False):
         display_df = expenses_df.copy()
-        display_df["amount"] = display_df["amount"].apply(lambda x: -abs(x))
-        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        display_df["amount"] = -display_df["amount"].abs()
+        render_table(display_df, "expense_transactions.csv")
 
 
+@st.fragment
 def earnings_section(earnings_df: pd.DataFrame) -> None:
     st.subheader("Earnings")
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(monthly_amount_bar(earnings_df, "Earnings", "Monthly Earnings"), use_container_width=True)
+        st.plotly_chart(cached_monthly_amount_bar(earnings_df, "Earnings", "Monthly Earnings"), use_container_width=True)
     with col2:
-        st.plotly_chart(category_pie(earnings_df, "Earnings", "Earnings by Category"), use_container_width=True)
+        st.plotly_chart(cached_category_pie(earnings_df, "Earnings", "Earnings by Category"), use_container_width=True)
 
     with st.expander("Earning transactions", expanded=False):
-        st.dataframe(earnings_df, use_container_width=True, hide_index=True)
+        render_table(earnings_df, "earning_transactions.csv")
 
 
 def net_worth_section(df: pd.DataFrame) -> None:
     st.subheader("Net Worth")
-    chart = net_worth_line(df, "Net Worth Over Time")
+    chart = cached_net_worth_line(df, "Net Worth Over Time")
     st.plotly_chart(chart, use_container_width=True)
     if "balance" in df.columns and df["balance"].notna().any():
         st.caption("Net worth uses account balances when provided by the source files.")
@@ -286,20 +409,17 @@ def net_worth_section(df: pd.DataFrame) -> None:
         )
 
 
+@st.fragment
 def top_expenses_section(expenses_df: pd.DataFrame) -> None:
     st.subheader("Top 10 Expenses")
-    top_expenses = expenses_df.copy()
-    top_expenses["abs_amount"] = top_expenses["amount"].abs()
-    top_expenses = top_expenses.sort_values("abs_amount", ascending=False).head(10)
-    top_expenses["amount"] = top_expenses["amount"].apply(lambda x: -abs(x))
+    top_index = expenses_df["amount"].abs().nlargest(10).index
+    top_expenses = expenses_df.loc[top_index].copy()
+    top_expenses["amount"] = -top_expenses["amount"].abs()
     with st.expander("Largest expenses this period", expanded=False):
-        st.dataframe(
-            top_expenses.drop(columns=["abs_amount"]),
-            use_container_width=True,
-            hide_index=True,
-        )
+        st.dataframe(top_expenses, use_container_width=True, hide_index=True)
 
 
+@st.fragment
 def category_drilldown_section(filtered: pd.DataFrame) -> None:
     st.subheader("Category Drilldown")
     categories = sorted(filtered["category"].dropna().unique().tolist())
@@ -312,7 +432,7 @@ def category_drilldown_section(filtered: pd.DataFrame) -> None:
         st.info("No records for this category in the current filter selection.")
         return
     st.plotly_chart(
-        category_pie(slice_df, slice_df.iloc[0]["class"], "Sub-category distribution"),
+        cached_category_pie(slice_df, slice_df.iloc[0]["class"], "Sub-category distribution"),
         use_container_width=True,
     )
 
@@ -330,9 +450,10 @@ def category_drilldown_section(filtered: pd.DataFrame) -> None:
     col2.metric("Average per transaction", format_currency(average_display))
 
     with st.expander(f"Transactions in {selected}", expanded=False):
-        st.dataframe(slice_df, use_container_width=True, hide_index=True)
+        render_table(slice_df, f"{selected}_transactions.csv")
 
 
+@st.fragment
 def others_section(filtered: pd.DataFrame) -> None:
     others_df = filtered[
         (filtered["category"] == "Others") | (filtered["sub_category"] == "Others")
@@ -341,13 +462,12 @@ def others_section(filtered: pd.DataFrame) -> None:
         if others_df.empty:
             st.write("No transactions are currently classified as Others.")
         else:
-            st.dataframe(others_df, use_container_width=True, hide_index=True)
+            render_table(others_df, "others_transactions.csv")
 
 
 def _run_acceptance_tests() -> None:
-    sample_raw = load_sample_data()
-    assert not sample_raw.empty, "Sample data should contain rows."
-    transformed = transform_dataset(sample_raw, use_api=False)
+    transformed = _transform_pipeline(ACCEPTANCE_DATA, use_api=False)
+    assert not transformed.empty, "Acceptance data should survive cleaning."
     required_columns = {"date", "description", "amount", "class", "category", "sub_category"}
     missing = required_columns.difference(transformed.columns)
     assert not missing, f"Missing columns after transformation: {missing}"
@@ -381,18 +501,20 @@ def main() -> None:
         )
 
     cleaned = transform_dataset(raw_df, use_api=use_api)
+    if cleaned.empty:
+        st.info("Load data above to unlock your personal finance insights.")
+        return
 
-    min_date = cleaned["date"].min()
-    max_date = cleaned["date"].max()
-    ensure_state_defaults(min_date, max_date)
-
-    current_signature = st.session_state.get("data_signature")
-    new_signature = (min_date, max_date, cleaned.shape[0])
-    if current_signature != new_signature:
-        set_full_period(min_date, max_date)
-        st.session_state["data_signature"] = new_signature
+    # transform_dataset returns rows sorted by date; the bounds span whole days.
+    min_dt = cleaned["date"].iloc[0].normalize().to_pydatetime()
+    max_dt = (
+        cleaned["date"].iloc[-1].normalize() + pd.Timedelta(days=1, microseconds=-1)
+    ).to_pydatetime()
+    ensure_state_defaults(min_dt, max_dt)
+    if st.session_state.pop("reset_period", False):
+        set_full_period(min_dt, max_dt)
 
-    render_filter_widgets(cleaned, min_date, max_date)
+    render_filter_widgets(cleaned, min_dt, max_dt)
 
     filtered = filter_dataset(cleaned)
     if filtered.empty:
@@ -402,8 +524,9 @@ def main() -> None:
     kpi_section(filtered)
     st.divider()
 
-    expenses_df = filtered[filtered["class"] == "Expenses"]
-    earnings_df = filtered[filtered["class"] == "Earnings"]
+    by_class = dict(list(filtered.groupby("class", observed=True, sort=False)))
+    expenses_df = by_class.get("Expenses", filtered.iloc[:0])
+    earnings_df = by_class.get("Earnings", filtered.iloc[:0])
 
     if not expenses_df.empty:
         expenses_section(expenses_df)
@@ -0,0 +1,67 @@
+import unittest
+
+import pandas as pd
+
+from io_utils import read_scotiabank_csv, remove_internal_transfers
+
+
+def _transfers(credit_dates, debit_dates, amount=100.0):
+    dates = list(credit_dates) + list(debit_dates)
+    return pd.DataFrame(
+        {
+            "date": pd.to_datetime(dates),
+            "description": ["Online Banking Transfer"] * len(dates),
+            "amount": [amount] * len(credit_dates) + [-amount] * len(debit_dates),
+            "account_name": "chequing",
+            "balance": pd.NA,
+        }
+    )
+
+
+class RemoveInternalTransfersTest(unittest.TestCase):
+    def test_pairs_many_same_day_same_amount_transfers(self):
+        df = _transfers(["2024-01-01"] * 2000, ["2024-01-01"] * 2000)
+        self.assertTrue(remove_internal_transfers(df).empty)
+
+    def test_pairs_many_same_amount_transfers_across_days(self):
+        df = _transfers(["2024-01-01"] * 2000, ["2024-01-02"] * 2000)
+        self.assertTrue(remove_internal_transfers(df).empty)
+
+    def test_same_day_ties_do_not_hide_a_nearer_debit(self):
+        df = _transfers(
+            ["2024-01-10", "2024-01-10", "2024-01-14", "2024-01-14"],
+            ["2024-01-09", "2024-01-11", "2024-01-12", "2024-01-12"],
+        )
+        self.assertTrue(remove_internal_transfers(df).empty)
+
+    def test_bulk_pairs_leave_debits_for_neighbouring_days(self):
+        df = _transfers(
+            ["2024-01-01"] * 2 + ["2024-01-02"] * 4 + ["2024-01-03", "2024-01-04"],
+            ["2024-01-01"] + ["2024-01-02"] * 4 + ["2024-01-03"] + ["2024-01-04"] * 3,
+        )
+        remaining = remove_internal_transfers(df)
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(remaining["amount"].iloc[0], -100.0)
+
+    def test_keeps_unmatched_surplus(self):
+        df = _transfers(["2024-01-01"] * 3, ["2024-01-01", "2024-01-02"])
+        remaining = remove_internal_transfers(df)
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(remaining["amount"].iloc[0], 100.0)
+
+    def test_ignores_transfers_outside_tolerance(self):
+        df = _transfers(["2024-01-01"], ["2024-01-10"])
+        self.assertEqual(len(remove_internal_transfers(df)), 2)
+
+
+class ReadScotiabankCsvTest(unittest.TestCase):
+    def test_whole_dollar_amounts_and_balances_load_as_float(self):
+        raw = b"Date,Description,Amount,Balance\n2024-01-02,Payroll,2800,3800\n2024-01-03,Rent,-1800,2000\n"
+        df = read_scotiabank_csv(raw, file_name="chequing.csv")
+        self.assertEqual(df["amount"].dtype, "float64")
+        self.assertEqual(df["balance"].dtype, "float64")
+        self.assertEqual(df["balance"].tolist(), [3800.0, 2000.0])
+
+
+if __name__ == "__main__":
+    unittest.main()